@@ -0,0 +1,130 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""
+Optional C accelerator for the 3MF fast path in thumbnail_common.py.
+Build in place with:
+
+    python setup_fastparse.py build_ext --inplace
+
+Both functions take a slice of a <vertices> or <triangles> section and
+return an (N, 3) array, or None if any tag in the slice is not a plain
+<vertex>/<triangle> element, in which case the caller falls back to the
+XML parser.
+"""
+
+import numpy as np
+
+from libc.stdlib cimport strtof, strtol
+from libc.string cimport memchr, memcmp
+
+
+cdef inline bint is_space(char c) noexcept nogil:
+    return c == b' ' or c == b'\t' or c == b'\n' or c == b'\r'
+
+
+cdef Py_ssize_t scan_tags(const char* data, Py_ssize_t length, const char* tag, Py_ssize_t tag_len,
+                          float* floats, int* ints, Py_ssize_t count) noexcept nogil:
+    """
+    Fill floats (x, y, z) or ints (v1, v2, v3) from every start tag in
+    data. Returns the number of tags parsed, or -1 on anything unexpected.
+    """
+    cdef const char* p = data
+    cdef const char* end = data + length
+    cdef const char* name
+    cdef const char* value
+    cdef char* stop
+    cdef char quote
+    cdef Py_ssize_t name_len
+    cdef Py_ssize_t n = 0
+    cdef int index, found
+
+    while True:
+        p = <const char*>memchr(p, b'<', end - p)
+        if p == NULL:
+            return n
+        p += 1
+        if p < end and p[0] == b'/':
+            continue
+        if n == count or end - p <= tag_len or memcmp(p, tag, tag_len) != 0:
+            return -1
+        p += tag_len
+        if not (is_space(p[0]) or p[0] == b'/' or p[0] == b'>'):
+            return -1
+
+        found = 0
+        while True:
+            while p < end and (is_space(p[0]) or p[0] == b'/'):
+                p += 1
+            if p >= end:
+                return -1
+            if p[0] == b'>':
+                break
+
+            name = p
+            while p < end and p[0] != b'=' and not is_space(p[0]) and p[0] != b'/' and p[0] != b'>':
+                p += 1
+            name_len = p - name
+            while p < end and is_space(p[0]):
+                p += 1
+            if p >= end or p[0] != b'=':
+                return -1
+            p += 1
+            while p < end and is_space(p[0]):
+                p += 1
+            if p >= end or (p[0] != b'"' and p[0] != b"'"):
+                return -1
+            quote = p[0]
+            value = p + 1
+            p = <const char*>memchr(value, quote, end - value)
+            if p == NULL:
+                return -1
+
+            # x/y/z for vertices, v1/v2/v3 for triangles; other attributes are ignored
+            index = -1
+            if floats != NULL:
+                if name_len == 1 and b'x' <= name[0] <= b'z':
+                    index = name[0] - c'x'
+                    floats[3 * n + index] = strtof(value, &stop)
+            elif name_len == 2 and name[0] == b'v' and b'1' <= name[1] <= b'3':
+                index = name[1] - c'1'
+                ints[3 * n + index] = <int>strtol(value, &stop, 10)
+            if index >= 0:
+                if stop == value or stop != p:
+                    return -1
+                found |= 1 << index
+            p += 1
+
+        if found != 7:
+            return -1
+        n += 1
+
+
+def parse_vertices(bytes segment):
+    """Parse the <vertex> tags in segment to a float32 (N, 3) array."""
+    cdef Py_ssize_t count = segment.count(b'<') - segment.count(b'</')
+    cdef const char* data = segment
+    cdef Py_ssize_t length = len(segment)
+    cdef Py_ssize_t parsed
+
+    values = np.empty((count, 3), dtype=np.float32)
+    if count == 0:
+        return values
+    cdef float[:, ::1] view = values
+    with nogil:
+        parsed = scan_tags(data, length, b'vertex', 6, &view[0, 0], NULL, count)
+    return values if parsed == count else None
+
+
+def parse_triangles(bytes segment):
+    """Parse the <triangle> tags in segment to an int32 (N, 3) array."""
+    cdef Py_ssize_t count = segment.count(b'<') - segment.count(b'</')
+    cdef const char* data = segment
+    cdef Py_ssize_t length = len(segment)
+    cdef Py_ssize_t parsed
+
+    values = np.empty((count, 3), dtype=np.int32)
+    if count == 0:
+        return values
+    cdef int[:, ::1] view = values
+    with nogil:
+        parsed = scan_tags(data, length, b'triangle', 8, NULL, &view[0, 0], count)
+    return values if parsed == count else None
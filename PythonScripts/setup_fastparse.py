@@ -0,0 +1,19 @@
+"""
+Build the optional _fastparse 3MF accelerator next to the thumbnail scripts:
+
+    pip install "cython>=3.0"
+    python setup_fastparse.py build_ext --inplace
+
+Cython is only needed for this build, not at runtime. The resulting
+_fastparse.pyd (.so elsewhere) is copied to the app output together with
+the scripts; the build/ folder and generated _fastparse.c are not. The
+scripts work without it and fall back to the regex/numpy parser.
+"""
+
+from setuptools import Extension, setup
+from Cython.Build import cythonize
+
+setup(
+    name='printvault-fastparse',
+    ext_modules=cythonize([Extension('_fastparse', ['_fastparse.pyx'])]),
+)
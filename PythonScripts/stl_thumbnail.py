@@ -7,18 +7,19 @@ Generates transparent PNG thumbnails from STL and 3MF files.
 import sys
 import json
 import os
-import zipfile
-import io
-from pathlib import Path
 
 try:
     import numpy as np
-    from stl import mesh
     import matplotlib
     matplotlib.use('Agg')  # Non-interactive backend
     import matplotlib.pyplot as plt
     from mpl_toolkits.mplot3d import Axes3D
     from mpl_toolkits.mplot3d.art3d import Poly3DCollection
+    from thumbnail_common import (
+        VIEW_ELEVATION, VIEW_AZIMUTH, render_thumbnail_gl, face_colors, fit_axes3d,
+        matplotlib_pixels, save_thumbnail_png,
+        mesh_bounds, decimate_vectors, mesh_volume, normalize_vectors, load_mesh
+    )
 except ImportError as e:
     print(json.dumps({
         "success": False,
@@ -27,152 +28,51 @@ except ImportError as e:
     sys.exit(1)
 
 
-def load_3mf_mesh(file_path: str):
+def render_thumbnail_matplotlib(vectors: np.ndarray, output_path: str, size: int) -> None:
     """
-    Load a mesh from a 3MF file.
-    3MF files are ZIP archives containing XML and 3D model data.
-    Handles multiple namespace formats for compatibility.
+    Render (N, 3, 3) normalized triangles to a transparent PNG with matplotlib,
+    framed and shaded like render_thumbnail_gl. mplot3d sorts whole faces by
+    depth, so overlapping faces can still come out in the wrong order.
     """
-    try:
-        import xml.etree.ElementTree as ET
-        
-        # 3MF files are ZIP archives
-        with zipfile.ZipFile(file_path, 'r') as zip_file:
-            # Look for the 3D model file (usually 3D/3dmodel.model)
-            model_files = [f for f in zip_file.namelist() if f.endswith('.model')]
-            
-            if not model_files:
-                raise Exception("No .model file found in 3MF archive")
-            
-            # Read the model XML
-            with zip_file.open(model_files[0]) as xml_file:
-                content = xml_file.read()
-                root = ET.fromstring(content)
-                
-                # Extract namespace from root tag
-                ns_uri = None
-                if root.tag.startswith('{'):
-                    ns_uri = root.tag.split('}')[0].strip('{')
-                
-                # Common 3MF namespaces to try
-                possible_namespaces = [
-                    ns_uri,
-                    'http://schemas.microsoft.com/3dmanufacturing/core/2015/02',
-                    'http://schemas.openxmlformats.org/3dmanufacturing/core/2015/02',
-                    None  # No namespace
-                ]
-                
-                def find_element(parent, tag, namespaces):
-                    """Try to find element with different namespace possibilities."""
-                    for ns in namespaces:
-                        if ns:
-                            elem = parent.find(f'{{{ns}}}{tag}')
-                            if elem is not None:
-                                return elem
-                        else:
-                            elem = parent.find(tag)
-                            if elem is not None:
-                                return elem
-                    return None
-                
-                def find_all_elements(parent, tag, namespaces):
-                    """Try to find all elements with different namespace possibilities."""
-                    for ns in namespaces:
-                        if ns:
-                            elems = parent.findall(f'{{{ns}}}{tag}')
-                            if elems:
-                                return elems
-                        else:
-                            elems = parent.findall(tag)
-                            if elems:
-                                return elems
-                    return []
-                
-                # Find resources (objects)
-                resources = find_element(root, 'resources', possible_namespaces)
-                
-                if resources is None:
-                    raise Exception("No resources found in 3MF file")
-
-                # Find objects
-                objects = find_all_elements(resources, 'object', possible_namespaces)
-                
-                if not objects:
-                    raise Exception("No object found in 3MF file")
-
-                # Find the first object with a mesh (prefer type='model')
-                object_node = None
-                for obj in objects:
-                    if obj.get('type', 'model') == 'model':
-                        mesh_check = find_element(obj, 'mesh', possible_namespaces)
-                        if mesh_check is not None:
-                            object_node = obj
-                            break
-                
-                # Fallback to any object with a mesh
-                if object_node is None:
-                    for obj in objects:
-                        mesh_check = find_element(obj, 'mesh', possible_namespaces)
-                        if mesh_check is not None:
-                            object_node = obj
-                            break
-                
-                if object_node is None:
-                    raise Exception("No object with mesh found in 3MF file")
-
-                mesh_node = find_element(object_node, 'mesh', possible_namespaces)
-                if mesh_node is None:
-                    raise Exception("No mesh found in 3MF object")
-
-                # Parse vertices
-                vertices_node = find_element(mesh_node, 'vertices', possible_namespaces)
-                vertices = []
-                if vertices_node is not None:
-                    vertex_elements = find_all_elements(vertices_node, 'vertex', possible_namespaces)
-                    for v in vertex_elements:
-                        x = float(v.get('x', 0))
-                        y = float(v.get('y', 0))
-                        z = float(v.get('z', 0))
-                        vertices.append([x, y, z])
-                
-                if len(vertices) == 0:
-                    raise Exception("No vertices found in 3MF mesh")
-                
-                np_vertices = np.array(vertices)
-
-                # Parse triangles
-                triangles_node = find_element(mesh_node, 'triangles', possible_namespaces)
-                faces = []
-                if triangles_node is not None:
-                    triangle_elements = find_all_elements(triangles_node, 'triangle', possible_namespaces)
-                    for t in triangle_elements:
-                        v1 = int(t.get('v1'))
-                        v2 = int(t.get('v2'))
-                        v3 = int(t.get('v3'))
-                        faces.append([v1, v2, v3])
-                
-                np_faces = np.array(faces)
-                
-                if len(np_faces) == 0:
-                    raise Exception("No triangles found in 3MF mesh")
-
-                # Create the mesh object
-                model_mesh = mesh.Mesh(np.zeros(np_faces.shape[0], dtype=mesh.Mesh.dtype))
-                for i, f in enumerate(np_faces):
-                    for j in range(3):
-                        model_mesh.vectors[i][j] = np_vertices[f[j], :]
-                
-                return model_mesh
-
-    except zipfile.BadZipFile:
-        raise Exception("Invalid 3MF file (not a valid ZIP)")
-    except Exception as e:
-        raise Exception(f"Failed to parse 3MF file: {str(e)}")
-
-
+    # Create figure with transparent background
+    fig = plt.figure(figsize=(size/100, size/100), dpi=100)
+    ax = fig.add_subplot(111, projection='3d')
+    # A single axes filling the whole figure, no margins
+    ax.set_position([0, 0, 1, 1])
+    
+    # Set transparent background
+    fig.patch.set_alpha(0)
+    ax.set_facecolor((0, 0, 0, 0))
+    ax.patch.set_alpha(0)
+    
+    # Create the 3D polygon collection; edges in the face color close the
+    # antialiasing seams between neighbouring faces
+    colors = face_colors(vectors)
+    poly_collection = Poly3DCollection(vectors, facecolors=colors, edgecolors=colors, linewidths=0.3)
+    ax.add_collection3d(poly_collection)
+    
+    # Set axis limits
+    ax.set_xlim([-1, 1])
+    ax.set_ylim([-1, 1])
+    ax.set_zlim([-1, 1])
+    
+    # Set viewing angle (isometric-like), orthographic with equal aspect like the GL camera
+    ax.set_box_aspect((1, 1, 1))
+    ax.set_proj_type('ortho')
+    ax.view_init(elev=VIEW_ELEVATION, azim=VIEW_AZIMUTH)
+    fit_axes3d(ax, vectors)
+    
+    # Remove axes and grid for clean look
+    ax.set_axis_off()
+    ax.grid(False)
+    
+    # The canvas is already exactly size x size with transparent patches,
+    # so write it directly instead of a tight-bbox savefig (second render pass)
+    save_thumbnail_png(matplotlib_pixels(fig.canvas), output_path)
+    plt.close(fig)
 
 
-def generate_thumbnail(file_path: str, output_path: str, size: int = 256) -> dict:
+def generate_thumbnail(file_path: str, output_path: str, size: int = 256, compute_volume: bool = True) -> dict:
     """
     Generate a transparent PNG thumbnail from an STL or 3MF file.
     
@@ -180,6 +80,7 @@ def generate_thumbnail(file_path: str, output_path: str, size: int = 256) -> dic
         file_path: Path to the STL or 3MF file
         output_path: Path for the output PNG file
         size: Size of the thumbnail (width and height)
+        compute_volume: Include the mesh volume in the metadata
     
     Returns:
         dict with success status and metadata
@@ -193,20 +94,14 @@ def generate_thumbnail(file_path: str, output_path: str, size: int = 256) -> dic
     }
     
     try:
-        # Detect file type
-        file_ext = Path(file_path).suffix.lower()
+        # Load the STL or 3MF mesh
+        stl_mesh = load_mesh(file_path)
         
-        # Load mesh based on file type
-        if file_ext == '.stl':
-            stl_mesh = mesh.Mesh.from_file(file_path)
-        elif file_ext == '.3mf':
-            stl_mesh = load_3mf_mesh(file_path)
-        else:
-            raise Exception(f"Unsupported file type: {file_ext}. Only .stl and .3mf are supported.")
+        # Contiguous copy of the triangles, shared by every full-resolution pass
+        vectors = np.ascontiguousarray(stl_mesh.vectors, dtype=np.float32)
         
         # Get mesh statistics
-        min_coords = stl_mesh.min_
-        max_coords = stl_mesh.max_
+        min_coords, max_coords = mesh_bounds(vectors)
         dimensions = max_coords - min_coords
         
         result["metadata"] = {
@@ -215,72 +110,22 @@ def generate_thumbnail(file_path: str, output_path: str, size: int = 256) -> dic
                 "y": float(dimensions[1]),
                 "z": float(dimensions[2])
             },
-            "volume": float(stl_mesh.get_mass_properties()[0]) if hasattr(stl_mesh, 'get_mass_properties') else None,
-            "triangles": len(stl_mesh.vectors)
+            "volume": mesh_volume(vectors) if compute_volume else None,
+            "triangles": len(vectors)
         }
         
-        # Create figure with transparent background
-        fig = plt.figure(figsize=(size/100, size/100), dpi=100)
-        ax = fig.add_subplot(111, projection='3d')
-        
-        # Set transparent background
-        fig.patch.set_alpha(0)
-        ax.set_facecolor((0, 0, 0, 0))
-        ax.patch.set_alpha(0)
-        
-        # Create polygon collection from mesh
-        vectors = stl_mesh.vectors
-        
-        # Normalize vertices to center the model
-        center = (min_coords + max_coords) / 2
-        vectors_centered = vectors - center
+        # Reduce huge meshes to what the thumbnail can resolve
+        vectors = decimate_vectors(vectors, min_coords, max_coords, size)
         
-        # Scale to fit
-        max_range = np.max(dimensions) / 2
-        if max_range > 0:
-            vectors_normalized = vectors_centered / max_range
-        else:
-            vectors_normalized = vectors_centered
-        
-        # Create the 3D polygon collection
-        poly_collection = Poly3DCollection(
-            vectors_normalized,
-            alpha=0.9,
-            facecolor='#39D0D8',  # Cyan accent color matching theme
-            edgecolor='#1a6b6e',
-            linewidth=0.1
-        )
-        ax.add_collection3d(poly_collection)
-        
-        # Set axis limits
-        ax.set_xlim([-1, 1])
-        ax.set_ylim([-1, 1])
-        ax.set_zlim([-1, 1])
-        
-        # Set viewing angle (isometric-like)
-        ax.view_init(elev=25, azim=45)
-        
-        # Remove axes and grid for clean look
-        ax.set_axis_off()
-        ax.grid(False)
-        
-        # Remove margins
-        plt.tight_layout(pad=0)
-        plt.subplots_adjust(left=0, right=1, top=1, bottom=0)
+        # Center the model and scale it to fit
+        vectors_normalized = normalize_vectors(vectors, min_coords, max_coords)
         
         # Ensure output directory exists
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
         
-        # Save with transparency
-        plt.savefig(
-            output_path,
-            format='png',
-            transparent=True,
-            dpi=100,
-            bbox_inches='tight',
-            pad_inches=0
-        )
-        plt.close(fig)
+        # Render on the GPU when available, otherwise fall back to matplotlib
+        if not render_thumbnail_gl(vectors_normalized, output_path, size):
+            render_thumbnail_matplotlib(vectors_normalized, output_path, size)
         
         result["success"] = True
         
@@ -294,10 +139,14 @@ def generate_thumbnail(file_path: str, output_path: str, size: int = 256) -> dic
 def main():
     """Main entry point for command-line usage."""
     try:
+        # --no-volume skips the volume calculation when the caller doesn't need it
+        compute_volume = '--no-volume' not in sys.argv
+        sys.argv = [a for a in sys.argv if a != '--no-volume']
+        
         if len(sys.argv) < 3:
             print(json.dumps({
                 "success": False,
-                "error": "Usage: python stl_thumbnail.py <file_path> <output_path> [size]"
+                "error": "Usage: python stl_thumbnail.py <file_path> <output_path> [size] [--no-volume]"
             }))
             sys.exit(1)
         
@@ -313,7 +162,7 @@ def main():
             }))
             sys.exit(1)
         
-        result = generate_thumbnail(file_path, output_path, size)
+        result = generate_thumbnail(file_path, output_path, size, compute_volume)
         print(json.dumps(result, indent=2))
         
         sys.exit(0 if result["success"] else 1)
@@ -3,22 +3,31 @@
 STL/3MF Batch Thumbnail Generator for PrintVault 3D
 Processes multiple STL and 3MF files in a single Python process invocation.
 Much faster than spawning a new process for each file.
+Jobs run on a thread pool by default; pass --processes to use a process
+pool instead (useful when GIL-bound 3MF parsing dominates).
+With --daemon the process stays alive and reads one JSON batch per stdin
+line, so startup is paid once per application session.
 """
 
 import sys
 import json
 import os
-import zipfile
-from pathlib import Path
-from concurrent.futures import ProcessPoolExecutor, as_completed
+import hashlib
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 
 try:
     import numpy as np
-    from stl import mesh
     import matplotlib
     matplotlib.use('Agg')  # Non-interactive backend
-    import matplotlib.pyplot as plt
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
     from mpl_toolkits.mplot3d.art3d import Poly3DCollection
+    from PIL import Image
+    from thumbnail_common import (
+        VIEW_ELEVATION, VIEW_AZIMUTH, get_gl_state, render_thumbnail_gl, face_colors,
+        fit_axes3d, matplotlib_pixels, save_thumbnail_png, set_chunk_workers, THUMBNAIL_STYLE_VERSION, mesh_bounds, decimate_vectors, normalize_vectors, load_mesh
+    )
 except ImportError as e:
     print(json.dumps({
         "success": False,
@@ -28,135 +37,178 @@ except ImportError as e:
     sys.exit(1)
 
 
-def load_3mf_mesh(file_path: str):
+# Matplotlib figures are per thread and must not be shared
+_renderer_local = threading.local()
+
+
+def get_matplotlib_figure(size: int):
     """
-    Load a mesh from a 3MF file.
-    3MF files are ZIP archives containing XML and 3D model data.
-    Handles multiple namespace formats for compatibility.
+    Return this thread's reusable figure and 3D axes, resized for this
+    thumbnail. Uses the object-oriented API since pyplot is not thread-safe.
     """
-    try:
-        import xml.etree.ElementTree as ET
+    if getattr(_renderer_local, 'figure', None) is None:
+        figure = Figure(figsize=(size/100, size/100), dpi=100)
+        FigureCanvasAgg(figure)
+        axes = figure.add_subplot(111, projection='3d')
+        # A single axes filling the whole figure, no margins
+        axes.set_position([0, 0, 1, 1])
         
-        with zipfile.ZipFile(file_path, 'r') as zip_file:
-            model_files = [f for f in zip_file.namelist() if f.endswith('.model')]
-            
-            if not model_files:
-                raise Exception("No .model file found in 3MF archive")
-            
-            with zip_file.open(model_files[0]) as xml_file:
-                content = xml_file.read()
-                root = ET.fromstring(content)
-                
-                ns_uri = None
-                if root.tag.startswith('{'):
-                    ns_uri = root.tag.split('}')[0].strip('{')
-                
-                possible_namespaces = [
-                    ns_uri,
-                    'http://schemas.microsoft.com/3dmanufacturing/core/2015/02',
-                    'http://schemas.openxmlformats.org/3dmanufacturing/core/2015/02',
-                    None
-                ]
-                
-                def find_element(parent, tag, namespaces):
-                    for ns in namespaces:
-                        if ns:
-                            elem = parent.find(f'{{{ns}}}{tag}')
-                            if elem is not None:
-                                return elem
-                        else:
-                            elem = parent.find(tag)
-                            if elem is not None:
-                                return elem
-                    return None
-                
-                def find_all_elements(parent, tag, namespaces):
-                    for ns in namespaces:
-                        if ns:
-                            elems = parent.findall(f'{{{ns}}}{tag}')
-                            if elems:
-                                return elems
-                        else:
-                            elems = parent.findall(tag)
-                            if elems:
-                                return elems
-                    return []
-                
-                resources = find_element(root, 'resources', possible_namespaces)
-                if resources is None:
-                    raise Exception("No resources found in 3MF file")
-
-                objects = find_all_elements(resources, 'object', possible_namespaces)
-                if not objects:
-                    raise Exception("No object found in 3MF file")
-
-                object_node = None
-                for obj in objects:
-                    if obj.get('type', 'model') == 'model':
-                        mesh_check = find_element(obj, 'mesh', possible_namespaces)
-                        if mesh_check is not None:
-                            object_node = obj
-                            break
-                
-                if object_node is None:
-                    for obj in objects:
-                        mesh_check = find_element(obj, 'mesh', possible_namespaces)
-                        if mesh_check is not None:
-                            object_node = obj
-                            break
-                
-                if object_node is None:
-                    raise Exception("No object with mesh found in 3MF file")
-
-                mesh_node = find_element(object_node, 'mesh', possible_namespaces)
-                if mesh_node is None:
-                    raise Exception("No mesh found in 3MF object")
-
-                vertices_node = find_element(mesh_node, 'vertices', possible_namespaces)
-                vertices = []
-                if vertices_node is not None:
-                    vertex_elements = find_all_elements(vertices_node, 'vertex', possible_namespaces)
-                    for v in vertex_elements:
-                        x = float(v.get('x', 0))
-                        y = float(v.get('y', 0))
-                        z = float(v.get('z', 0))
-                        vertices.append([x, y, z])
-                
-                if len(vertices) == 0:
-                    raise Exception("No vertices found in 3MF mesh")
-                
-                np_vertices = np.array(vertices)
-
-                triangles_node = find_element(mesh_node, 'triangles', possible_namespaces)
-                faces = []
-                if triangles_node is not None:
-                    triangle_elements = find_all_elements(triangles_node, 'triangle', possible_namespaces)
-                    for t in triangle_elements:
-                        v1 = int(t.get('v1'))
-                        v2 = int(t.get('v2'))
-                        v3 = int(t.get('v3'))
-                        faces.append([v1, v2, v3])
-                
-                np_faces = np.array(faces)
-                
-                if len(np_faces) == 0:
-                    raise Exception("No triangles found in 3MF mesh")
-
-                model_mesh = mesh.Mesh(np.zeros(np_faces.shape[0], dtype=mesh.Mesh.dtype))
-                for i, f in enumerate(np_faces):
-                    for j in range(3):
-                        model_mesh.vectors[i][j] = np_vertices[f[j], :]
-                
-                return model_mesh
-
-    except zipfile.BadZipFile:
-        raise Exception("Invalid 3MF file (not a valid ZIP)")
-    except Exception as e:
-        raise Exception(f"Failed to parse 3MF file: {str(e)}")
+        # Set transparent background
+        figure.patch.set_alpha(0)
+        axes.set_facecolor((0, 0, 0, 0))
+        axes.patch.set_alpha(0)
+        
+        # Set axis limits and view; orthographic with equal aspect like the GL camera
+        axes.set_xlim([-1, 1])
+        axes.set_ylim([-1, 1])
+        axes.set_zlim([-1, 1])
+        axes.set_box_aspect((1, 1, 1))
+        axes.set_proj_type('ortho')
+        axes.view_init(elev=VIEW_ELEVATION, azim=VIEW_AZIMUTH)
+        axes.set_axis_off()
+        axes.grid(False)
+        
+        _renderer_local.figure = figure
+        _renderer_local.axes = axes
+    
+    _renderer_local.figure.set_size_inches(size/100, size/100)
+    return _renderer_local.figure, _renderer_local.axes
+
+
+def render_thumbnail_matplotlib(vectors: np.ndarray, output_path: str, size: int, metadata: dict = None) -> None:
+    """
+    Render (N, 3, 3) normalized triangles to a transparent PNG with matplotlib,
+    framed and shaded like render_thumbnail_gl. mplot3d sorts whole faces by
+    depth, so overlapping faces can still come out in the wrong order.
+    """
+    fig, ax = get_matplotlib_figure(size)
+    
+    # Create 3D polygon collection; edges in the face color close the
+    # antialiasing seams between neighbouring faces
+    colors = face_colors(vectors)
+    poly_collection = Poly3DCollection(vectors, facecolors=colors, edgecolors=colors, linewidths=0.3)
+    ax.add_collection3d(poly_collection)
+    fit_axes3d(ax, vectors)
+    
+    try:
+        # Save thumbnail; the figure and axes patches are already transparent
+        save_thumbnail_png(matplotlib_pixels(fig.canvas), output_path, metadata)
+    finally:
+        # Leave the figure empty for the next job
+        poly_collection.remove()
+
+
+# PNG text keys identifying the input a thumbnail was rendered from
+CACHE_KEY_FIELD = 'PrintVault-Source'
+CACHE_METADATA_FIELD = 'PrintVault-Metadata'
+
+# Hard links to rendered thumbnails, one per cache key, inside the output
+# directory. Output names are unique per request, so this store is what lets
+# a pending or duplicate model skip rendering. An entry whose only name is
+# the store belongs to no thumbnail anymore (the host deleted it) and is
+# removed.
+CACHE_DIR_NAME = '.cache'
+
+# Output directories whose store was already swept by this process
+_pruned_cache_dirs = set()
+_prune_lock = threading.Lock()
+
+
+def file_digest(file_path: str) -> str:
+    """BLAKE2b digest of a file's content, read in 1 MB chunks."""
+    hasher = hashlib.blake2b(digest_size=20)
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def thumbnail_cache_key(digest: str, size: int, renderer: str) -> str:
+    """Key of a thumbnail: input content, size, renderer and thumbnail style."""
+    return f"{digest}:{size}:{renderer}:{THUMBNAIL_STYLE_VERSION}"
+
+
+def cache_entry_path(output_path: str, cache_key: str) -> str:
+    """Path of the stored link to the thumbnail for cache_key."""
+    return os.path.join(os.path.dirname(output_path), CACHE_DIR_NAME, cache_key.replace(':', '_') + '.png')
 
 
-def generate_single_thumbnail(file_path: str, output_path: str, size: int = 256) -> dict:
-    """Generate a single thumbnail from STL or 3MF file."""
+def link_atomically(source: str, target: str) -> None:
+    """
+    Hard-link source to target, replacing target atomically so concurrent
+    workers never see a partial file. Raises OSError where links are not
+    supported.
+    """
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    temp_path = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+    os.link(source, temp_path)
+    try:
+        os.replace(temp_path, target)
+    except OSError:
+        os.remove(temp_path)
+        raise
+
+
+def is_orphaned(entry_path: str) -> bool:
+    """True if a stored entry is no longer linked from any thumbnail."""
+    # os.scandir entries report no link count on Windows, so stat the path
+    return os.stat(entry_path).st_nlink <= 1
+
+
+def prune_cache_dir(cache_dir: str) -> None:
+    """Remove orphaned entries from a store, once per directory and process."""
+    with _prune_lock:
+        if cache_dir in _pruned_cache_dirs:
+            return
+        _pruned_cache_dirs.add(cache_dir)
+    try:
+        names = os.listdir(cache_dir)
+    except OSError:
+        return
+    for name in names:
+        entry_path = os.path.join(cache_dir, name)
+        try:
+            if name.endswith('.png') and is_orphaned(entry_path):
+                os.remove(entry_path)
+        except OSError:
+            pass
+
+
+def read_cache_entry(entry_path: str, cache_key: str):
+    """Metadata of a stored entry for cache_key, removing it if it is orphaned."""
+    try:
+        if is_orphaned(entry_path):
+            os.remove(entry_path)
+            return None
+    except OSError:
+        return None
+    return read_cached_metadata(entry_path, cache_key)
+
+
+def read_cached_metadata(output_path: str, cache_key: str):
+    """
+    Return the metadata stored in an existing thumbnail if it was rendered
+    for cache_key, otherwise None.
+    """
+    if not os.path.exists(output_path):
+        return None
+    try:
+        with Image.open(output_path) as image:
+            # Text chunks written before the image data are available without decoding it
+            if image.info.get(CACHE_KEY_FIELD) == cache_key:
+                return json.loads(image.info.get(CACHE_METADATA_FIELD, '{}'))
+    except Exception:
+        pass
+    return None
+
+
+def generate_single_thumbnail(file_path: str, output_path: str, size: int = 256,
+                              get_mesh=load_mesh, get_digest=file_digest, force: bool = False) -> dict:
+    """
+    Generate a single thumbnail from STL or 3MF file. get_digest hashes the
+    input and get_mesh loads it; the mesh is only loaded on a cache miss.
+    With force, cached thumbnails are ignored and replaced.
+    """
     result = {
         "file_path": file_path,
         "output_path": output_path,
@@ -167,19 +219,36 @@ def generate_single_thumbnail(file_path: str, output_path: str, size: int = 256)
     try:
         print(f"Processing: {os.path.basename(file_path)}", file=sys.stderr, flush=True)
         
-        # Detect file type and load mesh
-        file_ext = Path(file_path).suffix.lower()
+        # Thumbnails are deterministic for (content, size, renderer, style); reuse an existing one
+        digest = get_digest(file_path)
+        renderer = 'gl' if get_gl_state() is not None else 'matplotlib'
+        cache_key = thumbnail_cache_key(digest, size, renderer)
+        entry_path = cache_entry_path(output_path, cache_key)
+        prune_cache_dir(os.path.dirname(entry_path))
+        if not force:
+            cached_metadata = read_cached_metadata(output_path, cache_key)
+            if cached_metadata is not None:
+                result["metadata"] = cached_metadata
+                result["success"] = True
+                return result
+            
+            cached_metadata = read_cache_entry(entry_path, cache_key)
+            if cached_metadata is not None:
+                try:
+                    link_atomically(entry_path, output_path)
+                    result["metadata"] = cached_metadata
+                    result["success"] = True
+                    return result
+                except OSError:
+                    pass
+        
+        stl_mesh = get_mesh(file_path)
         
-        if file_ext == '.stl':
-            stl_mesh = mesh.Mesh.from_file(file_path)
-        elif file_ext == '.3mf':
-            stl_mesh = load_3mf_mesh(file_path)
-        else:
-            raise Exception(f"Unsupported file type: {file_ext}. Only .stl and .3mf are supported.")
+        # Contiguous copy of the triangles, shared by every full-resolution pass
+        vectors = np.ascontiguousarray(stl_mesh.vectors, dtype=np.float32)
         
         # Get mesh statistics
-        min_coords = stl_mesh.min_
-        max_coords = stl_mesh.max_
+        min_coords, max_coords = mesh_bounds(vectors)
         dimensions = max_coords - min_coords
         
         result["metadata"] = {
@@ -188,126 +257,177 @@ def generate_single_thumbnail(file_path: str, output_path: str, size: int = 256)
                 "y": float(dimensions[1]),
                 "z": float(dimensions[2])
             },
-            "triangles": len(stl_mesh.vectors)
+            "triangles": len(vectors)
         }
         
-        # Create figure
-        fig = plt.figure(figsize=(size/100, size/100), dpi=100)
-        ax = fig.add_subplot(111, projection='3d')
-        
-        # Set transparent background
-        fig.patch.set_alpha(0)
-        ax.set_facecolor((0, 0, 0, 0))
-        ax.patch.set_alpha(0)
-        
-        # Normalize and center
-        vectors = stl_mesh.vectors
-        center = (min_coords + max_coords) / 2
-        vectors_centered = vectors - center
-        max_range = np.max(dimensions) / 2
-        
-        if max_range > 0:
-            vectors_normalized = vectors_centered / max_range
-        else:
-            vectors_normalized = vectors_centered
+        # Normalize and center, decimating huge meshes first
+        vectors = decimate_vectors(vectors, min_coords, max_coords, size)
+        vectors_normalized = normalize_vectors(vectors, min_coords, max_coords)
         
-        # Create 3D polygon collection
-        poly_collection = Poly3DCollection(
-            vectors_normalized,
-            alpha=0.9,
-            facecolor='#39D0D8',
-            edgecolor='#1a6b6e',
-            linewidth=0.1
-        )
-        ax.add_collection3d(poly_collection)
-        
-        # Set axis limits and view
-        ax.set_xlim([-1, 1])
-        ax.set_ylim([-1, 1])
-        ax.set_zlim([-1, 1])
-        ax.view_init(elev=25, azim=45)
-        ax.set_axis_off()
-        ax.grid(False)
-        
-        plt.tight_layout(pad=0)
-        plt.subplots_adjust(left=0, right=1, top=1, bottom=0)
-        
-        # Ensure output directory exists
+        # Ensure output directory exists. The renderers write in place, so drop
+        # an existing output first in case it is a link to a stored copy
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        if os.path.exists(output_path):
+            os.remove(output_path)
         
-        # Save thumbnail
-        plt.savefig(
-            output_path,
-            format='png',
-            transparent=True,
-            dpi=100,
-            bbox_inches='tight',
-            pad_inches=0
-        )
-        plt.close(fig)
+        png_metadata = {
+            CACHE_KEY_FIELD: cache_key,
+            CACHE_METADATA_FIELD: json.dumps(result["metadata"])
+        }
+        
+        # GPU first, matplotlib as fallback; the key records the renderer actually used
+        if not render_thumbnail_gl(vectors_normalized, output_path, size, png_metadata):
+            cache_key = thumbnail_cache_key(digest, size, 'matplotlib')
+            entry_path = cache_entry_path(output_path, cache_key)
+            png_metadata[CACHE_KEY_FIELD] = cache_key
+            render_thumbnail_matplotlib(vectors_normalized, output_path, size, png_metadata)
         
         result["success"] = True
         
+        # Link the thumbnail into the store; it is already written, so failing
+        # to store it only costs a future re-render
+        try:
+            link_atomically(output_path, entry_path)
+        except OSError:
+            pass
+        
     except Exception as e:
         result["error"] = str(e)
-        # Ensure figure is closed on error
-        plt.close('all')
     
     return result
 
 
 
-def process_batch(jobs: list, max_workers: int = 4, stream: bool = False) -> dict:
+def load_once(function):
+    """Wrap a per-file loader so it runs at most once per input file."""
+    results = {}
+
+    def load(file_path):
+        if file_path not in results:
+            results[file_path] = function(file_path)
+        return results[file_path]
+
+    return load
+
+
+def generate_thumbnail_group(jobs: list) -> list:
+    """
+    Generate every job for one input file in order on the same worker. The
+    file is hashed and the mesh loaded at most once for the group, and both
+    are released when it ends; the mesh is treated as read-only, decimation
+    and normalization make copies.
+    """
+    get_mesh = load_once(load_mesh)
+    get_digest = load_once(file_digest)
+    return [
+        generate_single_thumbnail(job['input'], job['output'], job.get('size', 256), get_mesh, get_digest,
+                                  job.get('force', False))
+        for job in jobs
+    ]
+
+
+def init_worker(chunk_workers: int) -> None:
+    """
+    Pool initializer: create the renderer (GL context, or the reusable
+    matplotlib figure as fallback) before the worker takes its first job,
+    and share the CPUs between the pool and per-mesh chunk threads.
+    Runs once per worker thread or process.
+    """
+    set_chunk_workers(chunk_workers)
+    if get_gl_state() is None:
+        get_matplotlib_figure(256)
+
+
+def create_executor(max_workers: int = 4, use_processes: bool = False):
+    """Create the worker pool used for thumbnail jobs."""
+    # Rendering and numpy work mostly release the GIL, so threads avoid
+    # process startup and pickling; processes remain available for
+    # parse-heavy batches
+    executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+    chunk_workers = (os.cpu_count() or 1) // max_workers
+    return executor_class(max_workers=max_workers, initializer=init_worker, initargs=(chunk_workers,))
+
+
+def process_batch(jobs: list, max_workers: int = 4, stream: bool = False, use_processes: bool = False) -> dict:
     """
     Process multiple thumbnail jobs in parallel.
     
     Args:
-        jobs: List of dicts with 'input', 'output', 'size' keys
+        jobs: List of dicts with 'input', 'output', 'size' keys and an optional
+              'force' flag that re-renders a cached thumbnail
         max_workers: Number of parallel workers
         stream: If True, prints individual results to stdout as they complete
+        use_processes: If True, use a process pool instead of threads
     
     Returns:
         dict with overall success and list of individual results
     """
+    with create_executor(max_workers, use_processes) as executor:
+        return run_batch(executor, jobs, stream)
+
+
+# Stream lines from concurrent daemon batches must not interleave
+_output_lock = threading.Lock()
+
+
+def emit_line(message: dict) -> None:
+    """Print one stream-format JSON line to stdout."""
+    line = json.dumps(message)
+    with _output_lock:
+        print(line, flush=True)
+
+
+def tagged(message: dict, request_id) -> dict:
+    """Add the daemon request id to a stream message."""
+    if request_id is not None:
+        message["id"] = request_id
+    return message
+
+
+def run_batch(executor, jobs: list, stream: bool = False, request_id=None) -> dict:
+    """
+    Run a batch of jobs on an existing executor; see process_batch.
+    In stream mode, request_id (if given) is added to every line as 'id'.
+    """
     results = []
     success_count = 0
     
-    with ProcessPoolExecutor(max_workers=max_workers) as executor:
-        future_to_job = {
-            executor.submit(
-                generate_single_thumbnail,
-                job['input'],
-                job['output'],
-                job.get('size', 256)
-            ): job
-            for job in jobs
-        }
-        
-        for future in as_completed(future_to_job):
-            job = future_to_job[future]
-            try:
-                result = future.result()
-                results.append(result)
-                
-                if result.get('success', False):
-                    success_count += 1
-                
-                # In stream mode, allow real-time feedback
-                if stream:
-                    # Print result immediately as a single-line JSON
-                    print(json.dumps({"type": "result", "data": result}), flush=True)
-                    
-            except Exception as e:
-                # Handle unexpected future errors with correct context
-                err_result = {
+    # Group jobs by input so each file is parsed once for all its sizes
+    groups = {}
+    for job in jobs:
+        groups.setdefault(job['input'], []).append(job)
+    
+    future_to_group = {
+        executor.submit(generate_thumbnail_group, group): group
+        for group in groups.values()
+    }
+    
+    for future in as_completed(future_to_group):
+        group = future_to_group[future]
+        try:
+            group_results = future.result()
+        except Exception as e:
+            # Handle unexpected future errors with correct context
+            group_results = [
+                {
                     "success": False, 
                     "error": str(e), 
                     "file_path": job['input'], 
                     "output_path": job['output']
                 }
-                results.append(err_result)
-                if stream:
-                    print(json.dumps({"type": "result", "data": err_result}), flush=True)
+                for job in group
+            ]
+        
+        for result in group_results:
+            results.append(result)
+            
+            if result.get('success', False):
+                success_count += 1
+            
+            # In stream mode, allow real-time feedback
+            if stream:
+                # Print result immediately as a single-line JSON
+                emit_line(tagged({"type": "result", "data": result}, request_id))
 
     summary = {
         "success": True,
@@ -318,25 +438,77 @@ def process_batch(jobs: list, max_workers: int = 4, stream: bool = False) -> dic
     }
     
     if stream:
-        print(json.dumps({"type": "summary", "data": summary}), flush=True)
+        emit_line(tagged({"type": "summary", "data": summary}, request_id))
         
     return summary
 
 
+def emit_error_summary(error: str, request_id=None) -> None:
+    """Answer a daemon request that produced no results."""
+    emit_line(tagged({
+        "type": "summary",
+        "data": {"success": False, "error": error, "total": 0, "succeeded": 0, "failed": 0, "results": []}
+    }, request_id))
+
+
+def run_daemon(max_workers: int = 4, use_processes: bool = False) -> None:
+    """
+    Serve batches over stdin/stdout until stdin is closed.
+    
+    Each input line is a JSON object with a 'jobs' list and an optional
+    'id', answered in stream format: one "result" line per job, then a
+    "summary" line, each carrying the request's id. Batches run
+    concurrently on the shared worker pool, so lines of different requests
+    interleave and the host routes them by id. The pool, with each
+    worker's renderer, lives for the whole session, so interpreter and
+    import startup is paid once.
+    """
+    def serve(request_id, jobs):
+        try:
+            run_batch(executor, jobs, stream=True, request_id=request_id)
+        except Exception as e:
+            emit_error_summary(f"Batch failed: {e}", request_id)
+    
+    requests = []
+    with create_executor(max_workers, use_processes) as executor:
+        for line in sys.stdin:
+            if not line.strip():
+                continue
+            request_id = None
+            try:
+                request = json.loads(line)
+                request_id = request.get('id')
+                jobs = request.get('jobs', [])
+            except Exception as e:
+                # End the request with a summary. A line that isn't JSON carries no id
+                # to route it by, so the host only sees that request time out
+                emit_error_summary(f"Invalid request: {e}", request_id)
+                continue
+            # One thread per request only waits on the pool, which does the work
+            thread = threading.Thread(target=serve, args=(request_id, jobs), daemon=True)
+            thread.start()
+            requests.append(thread)
+            requests = [t for t in requests if t.is_alive()]
+        
+        for thread in requests:
+            thread.join()
+
+
 def main():
     """
     Main entry point for batch processing.
     """
     
     stream_mode = '--stream' in sys.argv
-    # Filter out --stream arg to not confuse other parsers
-    argv_clean = [a for a in sys.argv if a != '--stream']
+    use_processes = '--processes' in sys.argv
+    # Filter out flags to not confuse other parsers
+    argv_clean = [a for a in sys.argv if a not in ('--stream', '--processes')]
     sys.argv = argv_clean
     
     if len(sys.argv) < 2:
         print(json.dumps({
             "success": False,
-            "error": "Usage: python stl_thumbnail_batch.py <input> <output> [size] OR --batch <jobs.json> OR --batch-stdin [--stream]"
+            "error": "Usage: python stl_thumbnail_batch.py <input> <output> [size] OR --batch <jobs.json> OR --batch-stdin OR --daemon [--stream] [--processes]"
         }))
         sys.exit(1)
     
@@ -349,7 +521,7 @@ def main():
             data = json.load(f)
         
         jobs = data.get('jobs', [])
-        result = process_batch(jobs, max_workers, stream_mode)
+        result = process_batch(jobs, max_workers, stream_mode, use_processes)
         # Only print final result if NOT in stream mode (to avoid double printing)
         if not stream_mode:
             print(json.dumps(result))
@@ -361,11 +533,17 @@ def main():
         
         data = json.load(sys.stdin)
         jobs = data.get('jobs', [])
-        result = process_batch(jobs, max_workers, stream_mode)
+        result = process_batch(jobs, max_workers, stream_mode, use_processes)
         if not stream_mode:
             print(json.dumps(result))
         sys.exit(0 if result['success'] else 1)
     
+    # Long-lived mode: one JSON batch per stdin line
+    elif sys.argv[1] == '--daemon':
+        max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+        run_daemon(max_workers, use_processes)
+        sys.exit(0)
+    
     # Single file mode (backward compatible)
     else:
         if len(sys.argv) < 3:
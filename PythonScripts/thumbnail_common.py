@@ -0,0 +1,627 @@
+"""
+Shared mesh loading and GPU rendering for the PrintVault 3D thumbnail
+scripts (stl_thumbnail.py and stl_thumbnail_batch.py).
+"""
+
+import os
+import re
+import io
+import zipfile
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from stl import mesh
+from PIL import Image, PngImagePlugin
+
+# Optional GPU renderer; thumbnails fall back to matplotlib without it
+try:
+    import moderngl
+except ImportError:
+    moderngl = None
+
+# Optional C accelerator for the 3MF fast path, built with setup_fastparse.py
+try:
+    from _fastparse import parse_vertices, parse_triangles
+except ImportError:
+    parse_vertices = parse_triangles = None
+
+# Camera used for every thumbnail (isometric-like)
+VIEW_ELEVATION = 25
+VIEW_AZIMUTH = 45
+
+THUMBNAIL_COLOR = (0x39 / 255, 0xD0 / 255, 0xD8 / 255, 0.9)  # Cyan accent color matching theme
+
+# Light coming from the upper left of the camera, in camera space
+LIGHT_DIRECTION = np.array([-0.4, 0.6, 1.0]) / np.linalg.norm([-0.4, 0.6, 1.0])
+
+# Share of the frame the larger side of the projected model spans
+FRAME_FILL = 0.95
+
+# Bump when the framing or shading of thumbnails changes, so thumbnails
+# cached by the batch script are rendered again
+THUMBNAIL_STYLE_VERSION = 1
+
+GL_VERTEX_SHADER = '''
+#version 330
+uniform mat3 rotation;
+uniform vec3 offset;
+uniform vec3 scale;
+uniform vec3 light;
+in vec3 in_position;
+in vec3 in_normal;
+flat out float v_shade;
+void main() {
+    vec3 p = rotation * in_position;
+    vec3 n = rotation * in_normal;
+    // Two-sided Lambert term, same as face_colors
+    v_shade = 0.35 + 0.65 * abs(dot(n, light));
+    gl_Position = vec4((p - offset) * scale, 1.0);
+}
+'''
+
+GL_FRAGMENT_SHADER = '''
+#version 330
+uniform vec4 color;
+flat in float v_shade;
+out vec4 f_color;
+void main() {
+    f_color = vec4(color.rgb * v_shade, color.a);
+}
+'''
+
+# GL contexts are per thread and must not be shared
+_renderer_local = threading.local()
+
+
+def view_rotation() -> np.ndarray:
+    """Rotation matrix from model space to camera space (x right, y up, z towards the viewer)."""
+    elev = np.radians(VIEW_ELEVATION)
+    azim = np.radians(VIEW_AZIMUTH)
+    return np.array([
+        [-np.sin(azim), np.cos(azim), 0.0],
+        [-np.sin(elev) * np.cos(azim), -np.sin(elev) * np.sin(azim), np.cos(elev)],
+        [np.cos(elev) * np.cos(azim), np.cos(elev) * np.sin(azim), np.sin(elev)]
+    ], dtype=np.float32)
+
+
+def get_gl_state():
+    """
+    Lazily create the headless OpenGL context and shader program.
+    Returns None when moderngl or a usable GL driver is not available.
+    """
+    gl_state = getattr(_renderer_local, 'gl_state', None)
+    if gl_state is None:
+        gl_state = False
+        if moderngl is not None:
+            # Default backend first (WGL/CGL/GLX), then EGL for headless Linux
+            for kwargs in ({}, {'backend': 'egl'}):
+                try:
+                    ctx = moderngl.create_standalone_context(**kwargs)
+                    program = ctx.program(vertex_shader=GL_VERTEX_SHADER, fragment_shader=GL_FRAGMENT_SHADER)
+                    gl_state = (ctx, program)
+                    break
+                except Exception:
+                    continue
+        _renderer_local.gl_state = gl_state
+    return gl_state or None
+
+
+def face_normals(vectors: np.ndarray) -> np.ndarray:
+    """Unit normals of (N, 3, 3) triangles; degenerate faces get zero normals."""
+    normals = np.cross(vectors[:, 1] - vectors[:, 0], vectors[:, 2] - vectors[:, 0])
+    lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+    normals /= np.where(lengths > 0, lengths, 1)
+    return normals
+
+
+def face_colors(vectors: np.ndarray) -> np.ndarray:
+    """
+    Opaque per-face RGBA colors with the GL shader's two-sided Lambert
+    shading, so the matplotlib fallback looks like the GPU thumbnails. The
+    GL renderer keeps only the nearest face, so the thumbnail alpha is
+    applied to the finished image (see matplotlib_pixels), not per face.
+    """
+    light = view_rotation().T @ LIGHT_DIRECTION.astype(np.float32)
+    shade = 0.35 + 0.65 * np.abs(face_normals(vectors) @ light)
+    colors = np.ones((len(vectors), 4), dtype=np.float32)
+    colors[:, :3] = shade[:, None] * THUMBNAIL_COLOR[:3]
+    return colors
+
+
+def fit_axes3d(axes, vectors: np.ndarray) -> None:
+    """
+    Frame (N, 3, 3) triangles in a matplotlib 3D axes like the GL renderer:
+    the projected model is centered and its larger side spans FRAME_FILL of
+    the axes. The axes must already use the thumbnail view, an orthographic
+    projection and an equal box aspect.
+    """
+    points = vectors.reshape(-1, 3)
+    projected = np.c_[points, np.ones(len(points))] @ axes.get_proj().T
+    xy = projected[:, :2] / projected[:, 3:]
+    low = xy.min(axis=0)
+    high = xy.max(axis=0)
+    center = (low + high) / 2
+    half_extent = float(np.max(high - low)) / 2 / FRAME_FILL or 1.0
+    # The 2D view of an Axes3D is only set once at creation, so it can be
+    # pointed at the projected bounds directly
+    axes.viewLim.intervalx = (center[0] - half_extent, center[0] + half_extent)
+    axes.viewLim.intervaly = (center[1] - half_extent, center[1] + half_extent)
+
+
+def matplotlib_pixels(canvas) -> np.ndarray:
+    """
+    Draw a matplotlib Agg canvas and return its RGBA pixels with the
+    thumbnail alpha applied, as the GL renderer writes it.
+    """
+    canvas.draw()
+    pixels = np.array(canvas.buffer_rgba())
+    pixels[..., 3] = (pixels[..., 3] * THUMBNAIL_COLOR[3] + 0.5).astype(np.uint8)
+    return pixels
+
+
+def save_thumbnail_png(pixels: np.ndarray, output_path: str, metadata: dict = None) -> None:
+    """Write (size, size, 4) RGBA pixels to a PNG with metadata as text chunks."""
+    png_info = PngImagePlugin.PngInfo()
+    for key, value in (metadata or {}).items():
+        png_info.add_text(key, value)
+    Image.fromarray(pixels, 'RGBA').save(output_path, format='PNG', pnginfo=png_info)
+
+
+def render_thumbnail_gl(vectors: np.ndarray, output_path: str, size: int, metadata: dict = None) -> bool:
+    """
+    Render (N, 3, 3) normalized triangles to a transparent PNG on the GPU.
+    metadata is stored as PNG text chunks. Returns False if no OpenGL
+    context is available or the driver fails to render, so the caller can
+    fall back to matplotlib.
+    """
+    state = get_gl_state()
+    if state is None:
+        return False
+    ctx, program = state
+
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+
+    # Flat face normals, computed once and shared by the three vertices
+    normals = np.repeat(face_normals(vectors), 3, axis=0)
+
+    # Interleaved half floats: positions are within [-1, 1], so the error stays far below a pixel
+    vertex_data = np.empty((len(normals), 6), dtype=np.float16)
+    vertex_data[:, :3] = vectors.reshape(-1, 3)
+    vertex_data[:, 3:] = normals
+
+    # Fit the projected model into the frame, keeping the aspect ratio. Bounds
+    # come from the quantized positions the GPU actually sees, so the nearest
+    # and farthest faces are not clipped by the depth range
+    rotation = view_rotation()
+    points = vertex_data[:, :3].astype(np.float32) @ rotation.T
+    low = points.min(axis=0)
+    high = points.max(axis=0)
+    half_extent = max(float(high[0] - low[0]), float(high[1] - low[1])) / 2 or 1.0
+    half_depth = float(high[2] - low[2]) / 2 or 1.0
+    scale = FRAME_FILL / half_extent
+
+    resources = []
+    try:
+        program['rotation'].write(np.ascontiguousarray(rotation.T).tobytes())
+        program['offset'].value = tuple(float(v) for v in (low + high) / 2)
+        # Closer to the camera means larger z; flip it so depth testing keeps the
+        # nearest face, with a little slack for rounding in the shader
+        program['scale'].value = (scale, scale, -0.99 / half_depth)
+        program['color'].value = THUMBNAIL_COLOR
+        program['light'].value = tuple(float(v) for v in LIGHT_DIRECTION)
+
+        vbo = ctx.buffer(vertex_data)
+        resources.append(vbo)
+        vao = ctx.vertex_array(program, [(vbo, '3f2 3f2', 'in_position', 'in_normal')])
+        resources.append(vao)
+        samples = min(4, ctx.max_samples)
+        color_rb = ctx.renderbuffer((size, size), components=4, samples=samples)
+        resources.append(color_rb)
+        depth_rb = ctx.depth_renderbuffer((size, size), samples=samples)
+        resources.append(depth_rb)
+        fbo = ctx.framebuffer(color_attachments=[color_rb], depth_attachment=depth_rb)
+        resources.append(fbo)
+        resolve_fbo = ctx.simple_framebuffer((size, size), components=4)
+        resources.append(resolve_fbo)
+
+        fbo.use()
+        fbo.clear(0.0, 0.0, 0.0, 0.0, depth=1.0)
+        ctx.enable(moderngl.DEPTH_TEST)
+        vao.render(moderngl.TRIANGLES)
+        ctx.copy_framebuffer(resolve_fbo, fbo)
+        pixels = np.frombuffer(resolve_fbo.read(components=4), dtype=np.uint8).reshape(size, size, 4)
+    except Exception:
+        # The context exists but the driver rejected part of the setup (e.g.
+        # multisampled buffers); this thread uses matplotlib from now on
+        _renderer_local.gl_state = False
+        return False
+    finally:
+        for resource in reversed(resources):
+            resource.release()
+
+    # OpenGL rows start at the bottom
+    save_thumbnail_png(np.ascontiguousarray(np.flipud(pixels)), output_path, metadata)
+    return True
+
+
+# Meshes with more triangles than this split their full-resolution passes
+# across threads; numpy releases the GIL inside these operations
+PARALLEL_MIN_TRIANGLES = 500_000
+
+
+# Threads map_chunks may use per call; worker pools lower this so splitting
+# inside each worker does not oversubscribe the CPU
+_chunk_workers = os.cpu_count() or 1
+
+
+def set_chunk_workers(workers: int) -> None:
+    """Set how many threads map_chunks may use per call (at least one)."""
+    global _chunk_workers
+    _chunk_workers = max(1, workers)
+
+
+def map_chunks(function, vectors: np.ndarray) -> list:
+    """
+    Apply function to consecutive triangle chunks of vectors, one per
+    available thread for huge meshes. Returns the per-chunk results in order.
+    """
+    workers = _chunk_workers
+    if len(vectors) < PARALLEL_MIN_TRIANGLES or workers < 2:
+        return [function(vectors)]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(function, np.array_split(vectors, workers)))
+
+
+def mesh_bounds(vectors: np.ndarray):
+    """Per-axis (min, max) of (N, 3, 3) triangles."""
+    def chunk_bounds(chunk):
+        # Reducing rows of 9 values vectorizes far better than rows of 3
+        flat = chunk.reshape(-1, 9)
+        return flat.min(axis=0), flat.max(axis=0)
+    
+    lows, highs = zip(*map_chunks(chunk_bounds, vectors))
+    return np.min(lows, axis=0).reshape(3, 3).min(axis=0), np.max(highs, axis=0).reshape(3, 3).max(axis=0)
+
+
+def decimate_vectors(vectors: np.ndarray, min_coords: np.ndarray, max_coords: np.ndarray, size: int) -> np.ndarray:
+    """
+    Reduce meshes with more than max(size * size / 4, 20000) triangles to at
+    most that many. Vertices are clustered on a grid and replaced by their
+    cluster mean; triangles that collapse or duplicate another one are
+    dropped. The cell is sized from the surface area to hit the target and
+    widened while the result is still above it, never below one pixel.
+    """
+    target = max(size * size // 4, 20000)
+    extent = float(np.max(max_coords - min_coords))
+    if len(vectors) <= target or extent <= 0:
+        return vectors
+
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    points = vectors.reshape(-1, 3)
+
+    def chunk_area(chunk):
+        return np.linalg.norm(np.cross(chunk[:, 1] - chunk[:, 0], chunk[:, 2] - chunk[:, 0]), axis=1).sum(dtype=np.float64) / 2
+
+    def cluster(cell):
+        inv_cell = 1.0 / cell
+        # Same arithmetic as the per-point cells, so this is the largest cell index + 1
+        grid = ((max_coords - min_coords) * inv_cell).astype(np.int64) + 1
+
+        def cell_keys(chunk):
+            cells = ((chunk.reshape(-1, 3) - min_coords) * inv_cell).astype(np.int64)
+            return (cells[:, 0] * grid[1] + cells[:, 1]) * grid[2] + cells[:, 2]
+
+        _, clusters = np.unique(np.concatenate(map_chunks(cell_keys, vectors)), return_inverse=True)
+        clusters = clusters.reshape(-1, 3)
+        keep = (clusters[:, 0] != clusters[:, 1]) & (clusters[:, 1] != clusters[:, 2]) & (clusters[:, 0] != clusters[:, 2])
+        _, first = np.unique(np.sort(clusters[keep], axis=1), axis=0, return_index=True)
+        return clusters, clusters[keep][first]
+
+    # A clustered surface keeps about three triangles per cell of its area
+    area = float(sum(map_chunks(chunk_area, vectors)))
+    cell = max(extent / size, float(np.sqrt(3 * area / target)))
+    clusters, triangles = cluster(cell)
+    while len(triangles) > target:
+        # The triangle count falls with the square of the cell size
+        cell *= 1.05 * float(np.sqrt(len(triangles) / target))
+        clusters, triangles = cluster(cell)
+
+    counts = np.bincount(clusters.ravel())
+    means = np.stack([np.bincount(clusters.ravel(), weights=points[:, axis]) for axis in range(3)], axis=1)
+    means /= counts[:, None]
+    return means[triangles].astype(np.float32)
+
+
+def mesh_volume(vectors: np.ndarray) -> float:
+    """Signed mesh volume as a sum of origin tetrahedra, reduced per chunk in numpy."""
+    def chunk_volume(chunk):
+        chunk = chunk.astype(np.float64)
+        return np.einsum('ij,ij->i', chunk[:, 0], np.cross(chunk[:, 1], chunk[:, 2])).sum()
+    
+    return float(sum(map_chunks(chunk_volume, vectors)) / 6.0)
+
+
+def normalize_vectors(vectors: np.ndarray, min_coords: np.ndarray, max_coords: np.ndarray) -> np.ndarray:
+    """Center triangles on their bounding box and scale them into [-1, 1], in one float32 buffer."""
+    center = ((min_coords + max_coords) / 2).astype(np.float32)
+    normalized = np.empty(vectors.shape, dtype=np.float32)
+    np.subtract(vectors, center, out=normalized)
+    
+    max_range = float(np.max(max_coords - min_coords)) / 2
+    if max_range > 0:
+        np.multiply(normalized, np.float32(1.0 / max_range), out=normalized)
+    return normalized
+
+
+# Attribute strings buffered per 3MF mesh before converting them to a numpy chunk
+PARSE_CHUNK_SIZE = 3 * 65536
+
+# Structural 3MF tags; the vertex and triangle tags between them are matched in bulk
+MODEL_TAG_PATTERN = re.compile(rb'<(/?)(?:[\w.-]+:)?(resources|object|mesh|vertices|triangles)\b([^>]*)>')
+OBJECT_TYPE_PATTERN = re.compile(rb'\btype="([^"]*)"')
+VERTEX_PATTERN = re.compile(rb'<vertex\s+(x="[^"]*"\s+y="[^"]*"\s+z="[^"]*")')
+TRIANGLE_PATTERN = re.compile(rb'<triangle\s+(v1="[^"]*"\s+v2="[^"]*"\s+v3="[^"]*")')
+
+
+def scan_3mf_section(segment: bytes, section: bytes):
+    """
+    Convert the tags in a slice of a <vertices> or <triangles> section to an
+    (N, 3) array: one regex pass collects the attribute runs, which are
+    reduced to plain numbers and parsed by a single numpy call (or the
+    _fastparse extension when it is built).
+    Returns None if any tag in the slice isn't in canonical form.
+    """
+    if parse_vertices is not None:
+        return parse_vertices(segment) if section == b'vertices' else parse_triangles(segment)
+    
+    if section == b'vertices':
+        matches = VERTEX_PATTERN.findall(segment)
+        # x="1" y="2" z="3" -> 1 2 3
+        text = b' '.join(matches).translate(None, b'xyz="')
+        dtype = np.float32
+    else:
+        matches = TRIANGLE_PATTERN.findall(segment)
+        text = b' '.join(matches).replace(b'v1=', b'').replace(b'v2=', b'').replace(b'v3=', b'').translate(None, b'"')
+        dtype = np.int32
+
+    # Every start tag must have matched, otherwise indices would shift
+    if len(matches) != segment.count(b'<') - segment.count(b'</'):
+        return None
+    if not matches:
+        return np.empty((0, 3), dtype=dtype)
+
+    try:
+        values = np.fromstring(text, dtype=dtype, sep=' ')
+    except ValueError:
+        return None
+    if values.size != 3 * len(matches):
+        return None
+    return values.reshape(-1, 3)
+
+
+def scan_3mf_model(xml_file):
+    """
+    Fast path for 3MF model XML: scan the decompressed text with regular
+    expressions instead of creating an element per vertex and triangle.
+    Returns (vertices, faces) of the first object with a mesh, preferring
+    type='model', or None when the XML needs the full parser (no usable
+    object, namespace-prefixed tags, non-canonical attribute layout).
+    """
+    object_type = None
+    has_mesh = False
+    section = None
+    vertex_chunks, triangle_chunks = [], []
+    fallback = None
+    pending = b''
+
+    for chunk in iter(lambda: xml_file.read(1 << 20), b''):
+        # Only scan up to the last complete tag; the rest waits for the next chunk
+        data = pending + chunk
+        cut = data.rfind(b'>') + 1
+        data, pending = data[:cut], data[cut:]
+        position = 0
+
+        for match in MODEL_TAG_PATTERN.finditer(data):
+            if section is not None:
+                parsed = scan_3mf_section(data[position:match.start()], section)
+                if parsed is None:
+                    return None
+                (vertex_chunks if section == b'vertices' else triangle_chunks).append(parsed)
+            position = match.end()
+            closing, tag, attributes = match.groups()
+
+            if closing:
+                if tag == b'vertices' or tag == b'triangles':
+                    section = None
+                elif tag == b'object' and has_mesh and (object_type == b'model' or fallback is None):
+                    parsed = (
+                        np.concatenate(vertex_chunks or [np.empty((0, 3), dtype=np.float32)]),
+                        np.concatenate(triangle_chunks or [np.empty((0, 3), dtype=np.int32)])
+                    )
+                    if object_type == b'model':
+                        return parsed
+                    fallback = parsed
+            elif tag == b'object':
+                type_match = OBJECT_TYPE_PATTERN.search(attributes)
+                object_type = type_match.group(1) if type_match else b'model'
+                has_mesh = False
+                vertex_chunks, triangle_chunks = [], []
+            elif tag == b'mesh':
+                has_mesh = True
+            elif (tag == b'vertices' or tag == b'triangles') and not attributes.endswith(b'/'):
+                section = tag
+
+        if section is not None:
+            parsed = scan_3mf_section(data[position:], section)
+            if parsed is None:
+                return None
+            (vertex_chunks if section == b'vertices' else triangle_chunks).append(parsed)
+
+    return fallback
+
+
+def parse_3mf_model(xml_file):
+    """
+    Parse 3MF model XML with iterparse so the element tree is never fully
+    materialized. Core tags are resolved once against the root element's
+    namespace (or none), so no per-element namespace handling is needed.
+    Returns (vertices, faces) of the first object with a mesh, preferring
+    type='model'.
+    """
+    import xml.etree.ElementTree as ET
+    
+    found_resources = False
+    found_object = False
+    object_type = None
+    has_mesh = False
+    container = None
+    vertex_chunks, vertex_values = [], []
+    triangle_chunks, triangle_values = [], []
+    selected = None
+    fallback = None
+    tags = None
+    
+    for event, elem in ET.iterparse(xml_file, events=('start', 'end')):
+        if tags is None:
+            # The first event is the root <model>; core elements share its namespace
+            namespace = elem.tag[:elem.tag.index('}') + 1] if elem.tag.startswith('{') else ''
+            tags = {
+                namespace + name: name
+                for name in ('resources', 'object', 'mesh', 'vertices', 'triangles', 'vertex', 'triangle')
+            }
+        
+        tag = tags.get(elem.tag)
+        if tag is None:
+            continue
+        
+        if event == 'start':
+            if tag == 'vertices' or tag == 'triangles':
+                container = elem
+            elif tag == 'mesh':
+                has_mesh = True
+            elif tag == 'object':
+                found_object = True
+                object_type = elem.get('type', 'model')
+                has_mesh = False
+                vertex_chunks, vertex_values = [], []
+                triangle_chunks, triangle_values = [], []
+            elif tag == 'resources':
+                found_resources = True
+            continue
+        
+        if tag == 'vertex':
+            vertex_values += (elem.get('x', '0'), elem.get('y', '0'), elem.get('z', '0'))
+            if len(vertex_values) >= PARSE_CHUNK_SIZE:
+                vertex_chunks.append(np.fromiter(vertex_values, dtype=np.float32, count=len(vertex_values)))
+                vertex_values = []
+            # Drop parsed elements so memory stays bounded
+            container.clear()
+        elif tag == 'triangle':
+            triangle_values += (elem.get('v1'), elem.get('v2'), elem.get('v3'))
+            if len(triangle_values) >= PARSE_CHUNK_SIZE:
+                triangle_chunks.append(np.fromiter(triangle_values, dtype=np.int32, count=len(triangle_values)))
+                triangle_values = []
+            container.clear()
+        elif tag == 'object':
+            if has_mesh and (object_type == 'model' or fallback is None):
+                vertex_chunks.append(np.fromiter(vertex_values, dtype=np.float32, count=len(vertex_values)))
+                triangle_chunks.append(np.fromiter(triangle_values, dtype=np.int32, count=len(triangle_values)))
+                parsed = (
+                    np.concatenate(vertex_chunks).reshape(-1, 3),
+                    np.concatenate(triangle_chunks).reshape(-1, 3)
+                )
+                if object_type == 'model':
+                    selected = parsed
+                    break
+                fallback = parsed
+            elem.clear()
+    
+    if not found_resources:
+        raise Exception("No resources found in 3MF file")
+    
+    if not found_object:
+        raise Exception("No object found in 3MF file")
+    
+    if selected is None:
+        selected = fallback
+    
+    if selected is None:
+        raise Exception("No object with mesh found in 3MF file")
+    
+    return selected
+
+
+def load_stl_mesh(file_path: str):
+    """
+    Load an STL file. Binary files are read straight into numpy-stl's record
+    dtype with one read; anything else goes through the stock parser. Face
+    normals aren't computed since the renderers derive their own.
+    """
+    with open(file_path, 'rb') as f:
+        header = f.read(84)
+    
+    if len(header) == 84:
+        count = int.from_bytes(header[80:84], 'little')
+        # ASCII files start with 'solid' and never match the binary layout size
+        if os.path.getsize(file_path) == 84 + 50 * count:
+            data = np.fromfile(file_path, dtype=mesh.Mesh.dtype, count=count, offset=84)
+            return mesh.Mesh(data, calculate_normals=False)
+    
+    return mesh.Mesh.from_file(file_path, calculate_normals=False)
+
+
+def load_3mf_mesh(file_path: str):
+    """
+    Load a mesh from a 3MF file.
+    3MF files are ZIP archives containing XML and 3D model data.
+    The model XML is scanned with the regex fast path and re-read with the
+    XML parser only when the fast path can't handle it.
+    """
+    try:
+        # 3MF files are ZIP archives
+        with zipfile.ZipFile(file_path, 'r') as zip_file:
+            # Look for the 3D model file (usually 3D/3dmodel.model)
+            model_files = [f for f in zip_file.namelist() if f.endswith('.model')]
+            
+            if not model_files:
+                raise Exception("No .model file found in 3MF archive")
+            
+            # Stream the model XML, decompressing in 1 MB reads
+            with zip_file.open(model_files[0]) as entry, io.BufferedReader(entry, buffer_size=1 << 20) as xml_file:
+                selected = scan_3mf_model(xml_file)
+            
+            if selected is None:
+                with zip_file.open(model_files[0]) as entry, io.BufferedReader(entry, buffer_size=1 << 20) as xml_file:
+                    selected = parse_3mf_model(xml_file)
+            
+            np_vertices, np_faces = selected
+            
+            if len(np_vertices) == 0:
+                raise Exception("No vertices found in 3MF mesh")
+            
+            if len(np_faces) == 0:
+                raise Exception("No triangles found in 3MF mesh")
+
+            # Create the mesh object, filling all triangles with one fancy-index
+            model_mesh = mesh.Mesh(np.zeros(len(np_faces), dtype=mesh.Mesh.dtype), calculate_normals=False)
+            model_mesh.vectors[:] = np_vertices[np_faces]
+            
+            return model_mesh
+
+    except zipfile.BadZipFile:
+        raise Exception("Invalid 3MF file (not a valid ZIP)")
+    except Exception as e:
+        raise Exception(f"Failed to parse 3MF file: {str(e)}")
+
+
+def load_mesh(file_path: str):
+    """Load an STL or 3MF file, picking the loader from the extension."""
+    file_ext = Path(file_path).suffix.lower()
+    
+    if file_ext == '.stl':
+        return load_stl_mesh(file_path)
+    if file_ext == '.3mf':
+        return load_3mf_mesh(file_path)
+    raise Exception(f"Unsupported file type: {file_ext}. Only .stl and .3mf are supported.")
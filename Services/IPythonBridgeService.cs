@@ -53,6 +53,11 @@ public class ThumbnailJob
     public string InputPath { get; set; } = string.Empty;
     public string OutputPath { get; set; } = string.Empty;
     public int ModelId { get; set; }
+
+    /// <summary>
+    /// Render even if a cached thumbnail for the same file content exists.
+    /// </summary>
+    public bool Force { get; set; }
 }
 
 /// <summary>
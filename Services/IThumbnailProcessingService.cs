@@ -44,9 +44,10 @@ public interface IThumbnailProcessingService : IDisposable
     bool IsProcessing { get; }
 
     /// <summary>
-    /// Queues a model for thumbnail generation.
+    /// Queues a model for thumbnail generation. With regenerate, the thumbnail is
+    /// rendered again instead of being reused from the thumbnail cache.
     /// </summary>
-    void QueueModel(Model3D model);
+    void QueueModel(Model3D model, bool regenerate = false);
 
     /// <summary>
     /// Starts processing the queue.
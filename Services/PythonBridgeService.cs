@@ -1,3 +1,4 @@
+using System.Collections.Concurrent;
 using System.Diagnostics;
 using System.IO;
 using System.Text.Json;
@@ -9,7 +10,7 @@ namespace PrintVault3D.Services;
 /// <summary>
 /// Service for calling Python scripts for STL/G-code processing.
 /// </summary>
-public class PythonBridgeService : IPythonBridgeService
+public class PythonBridgeService : IPythonBridgeService, IDisposable
 {
     private readonly string _pythonPath;
     private readonly JsonSerializerOptions _jsonOptions;
@@ -21,6 +22,15 @@ public class PythonBridgeService : IPythonBridgeService
     private readonly TimeSpan _cacheDuration = TimeSpan.FromMinutes(5);
     private readonly object _cacheLock = new();
 
+    // Long-lived batch script (--daemon), started on first use and reused so
+    // interpreter and import startup is paid once per session. Concurrent
+    // batches share it: each carries an id that the daemon echoes on its
+    // output lines, and one reader routes them back to the caller.
+    private DaemonConnection? _daemon;
+    private readonly object _daemonLock = new();
+    private long _nextDaemonRequestId;
+    private bool _disposed;
+
     public string ScriptsPath { get; }
 
     public PythonBridgeService(ILogger<PythonBridgeService>? logger = null)
@@ -244,7 +254,8 @@ public class PythonBridgeService : IPythonBridgeService
                 {
                     input = j.InputPath,
                     output = j.OutputPath,
-                    size = size
+                    size = size,
+                    force = j.Force
                 }).ToArray()
             };
 
@@ -350,20 +361,16 @@ public class PythonBridgeService : IPythonBridgeService
                 {
                     input = j.InputPath,
                     output = j.OutputPath,
-                    size = size
+                    size = size,
+                    force = j.Force
                 }).ToArray()
             };
 
-            var jsonInput = JsonSerializer.Serialize(batchInput, _jsonOptions);
-            
-            // Use --batch-stdin --stream mode
-            // We use the batch script path explicitly
-            var args = $"\"{batchScriptPath}\" --batch-stdin {Math.Min(Environment.ProcessorCount, 12)} --stream";
-
             // Timeout: 45 seconds base + 15 seconds per file
             int timeoutSeconds = 45 + (jobsList.Count * 15);
 
-            await RunCommandStreamAsync(_pythonPath, args, jsonInput, 
+            // The daemon answers in --stream format, one batch per line
+            await RunDaemonBatchAsync(batchScriptPath, batchInput.jobs, 
                 onLine: (line) => 
                 {
                     if (string.IsNullOrWhiteSpace(line)) return;
@@ -507,45 +514,180 @@ public class PythonBridgeService : IPythonBridgeService
         return result;
     }
 
-    private async Task RunCommandStreamAsync(string command, string arguments, string stdin, Action<string> onLine, int timeoutSeconds = 60, CancellationToken cancellationToken = default)
+    /// <summary>
+    /// Send one batch to the daemon and pass its output lines to onLine until the batch summary.
+    /// Batches from concurrent callers run side by side on the daemon's worker pool.
+    /// </summary>
+    private async Task RunDaemonBatchAsync(string batchScriptPath, object jobs, Action<string> onLine, int timeoutSeconds = 60, CancellationToken cancellationToken = default)
     {
-        var startInfo = new ProcessStartInfo
-        {
-            FileName = command,
-            Arguments = arguments,
-            RedirectStandardInput = true,
-            RedirectStandardOutput = true,
-            RedirectStandardError = true,
-            UseShellExecute = false,
-            CreateNoWindow = true,
-            StandardOutputEncoding = System.Text.Encoding.UTF8,
-            StandardErrorEncoding = System.Text.Encoding.UTF8
-        };
+        var daemon = GetDaemon(batchScriptPath);
+        var id = Interlocked.Increment(ref _nextDaemonRequestId);
+        var request = new DaemonRequest(onLine);
+
+        daemon.Requests[id] = request;
+        try
+        {
+            // The reader ends pending batches once the daemon exits; check again in
+            // case this one was registered after that happened
+            if (daemon.Closed)
+                throw new IOException("Thumbnail daemon exited before finishing the batch");
+
+            var jsonInput = JsonSerializer.Serialize(new { id, jobs }, _jsonOptions);
+
+            await daemon.WriteLock.WaitAsync(cancellationToken);
+            try
+            {
+                await daemon.Process.StandardInput.WriteLineAsync(jsonInput);
+                await daemon.Process.StandardInput.FlushAsync();
+            }
+            finally
+            {
+                daemon.WriteLock.Release();
+            }
+
+            var sentTicks = Environment.TickCount64;
+            try
+            {
+                await request.Completed.Task.WaitAsync(TimeSpan.FromSeconds(timeoutSeconds), cancellationToken);
+            }
+            catch (TimeoutException) when (Volatile.Read(ref daemon.LastOutputTicks) < sentTicks)
+            {
+                // No batch got a result while this one waited, so the workers are stuck on
+                // hung jobs; Python threads can't be stopped, so replace the whole daemon
+                _logger?.LogWarning("Thumbnail daemon made no progress in {Seconds}s, restarting it", timeoutSeconds);
+                StopDaemon(daemon);
+                throw;
+            }
+        }
+        finally
+        {
+            // Lines still arriving for an abandoned batch are dropped by the reader,
+            // so other batches on the daemon are not affected
+            daemon.Requests.TryRemove(id, out _);
+        }
+    }
 
-        using var process = new Process { StartInfo = startInfo };
-        process.Start();
+    private DaemonConnection GetDaemon(string batchScriptPath)
+    {
+        lock (_daemonLock)
+        {
+            if (_daemon is { Closed: false } current && !current.Process.HasExited)
+                return current;
 
-        // Write to stdin
-        await process.StandardInput.WriteAsync(stdin);
-        await process.StandardInput.FlushAsync();
-        process.StandardInput.Close();
+            StopDaemon();
 
-        // Handle stderr asynchronously to avoid blocking
-        process.ErrorDataReceived += (s, e) => { /* We could log error lines here if needed */ };
-        process.BeginErrorReadLine();
+            var startInfo = new ProcessStartInfo
+            {
+                FileName = _pythonPath,
+                Arguments = $"\"{batchScriptPath}\" --daemon {Math.Min(Environment.ProcessorCount, 12)}",
+                RedirectStandardInput = true,
+                RedirectStandardOutput = true,
+                RedirectStandardError = true,
+                UseShellExecute = false,
+                CreateNoWindow = true,
+                StandardOutputEncoding = System.Text.Encoding.UTF8,
+                StandardErrorEncoding = System.Text.Encoding.UTF8
+            };
+
+            var process = new Process { StartInfo = startInfo };
+            process.Start();
+
+            // Drain stderr (progress prints) so the pipe never fills up
+            process.ErrorDataReceived += (s, e) => { };
+            process.BeginErrorReadLine();
+
+            _logger?.LogInformation("Started thumbnail daemon (PID {ProcessId})", process.Id);
+            var daemon = new DaemonConnection(process);
+            _ = Task.Run(() => ReadDaemonOutputAsync(daemon));
+            _daemon = daemon;
+            return daemon;
+        }
+    }
 
-        // Read stdout line by line
-        string? line;
-        while ((line = await process.StandardOutput.ReadLineAsync(cancellationToken)) != null)
+    /// <summary>
+    /// Route the daemon's output lines to the batch named by their id until the daemon exits.
+    /// </summary>
+    private async Task ReadDaemonOutputAsync(DaemonConnection daemon)
+    {
+        try
         {
-            if (!string.IsNullOrWhiteSpace(line))
+            string? line;
+            while ((line = await daemon.Process.StandardOutput.ReadLineAsync()) != null)
             {
-                onLine(line);
+                Volatile.Write(ref daemon.LastOutputTicks, Environment.TickCount64);
+                if (!TryParseDaemonLine(line, out var id, out var isSummary)) continue;
+                if (!daemon.Requests.TryGetValue(id, out var request)) continue;
+
+                try
+                {
+                    request.OnLine(line);
+                }
+                catch (Exception ex)
+                {
+                    _logger?.LogWarning(ex, "Failed to handle thumbnail daemon output");
+                }
+
+                if (isSummary) request.Completed.TrySetResult();
             }
+
+            if (!_disposed) _logger?.LogWarning("Thumbnail daemon exited");
+        }
+        catch (Exception ex)
+        {
+            // Stopping the daemon disposes the stream under the reader
+            if (!_disposed) _logger?.LogDebug(ex, "Stopped reading thumbnail daemon output");
         }
 
-        // Wait for exit
-        await process.WaitForExitAsync(cancellationToken).WaitAsync(TimeSpan.FromSeconds(timeoutSeconds), cancellationToken);
+        // Batches still in flight end with the results they got; the daemon is
+        // restarted on the next call
+        daemon.Closed = true;
+        foreach (var id in daemon.Requests.Keys)
+        {
+            if (daemon.Requests.TryRemove(id, out var request))
+            {
+                if (!_disposed) _logger?.LogWarning("Thumbnail daemon exited before finishing the batch");
+                request.Completed.TrySetResult();
+            }
+        }
+    }
+
+    private void StopDaemon(DaemonConnection? expected = null)
+    {
+        lock (_daemonLock)
+        {
+            // A caller stopping a specific daemon must not kill one that already replaced it
+            if (_daemon == null || (expected != null && _daemon != expected)) return;
+
+            try
+            {
+                if (!_daemon.Process.HasExited) _daemon.Process.Kill();
+            }
+            catch { }
+
+            _daemon.Process.Dispose();
+            _daemon = null;
+        }
+    }
+
+    private static bool TryParseDaemonLine(string line, out long id, out bool isSummary)
+    {
+        id = 0;
+        isSummary = false;
+        if (string.IsNullOrWhiteSpace(line)) return false;
+
+        try
+        {
+            using var doc = JsonDocument.Parse(line);
+            if (!doc.RootElement.TryGetProperty("id", out var idProp) || !idProp.TryGetInt64(out id))
+                return false;
+
+            isSummary = doc.RootElement.TryGetProperty("type", out var typeProp) && typeProp.GetString() == "summary";
+            return true;
+        }
+        catch
+        {
+            return false;
+        }
     }
 
     public async Task<GcodeParseResult> ParseGcodeAsync(string gcodePath)
@@ -769,6 +911,34 @@ public class PythonBridgeService : IPythonBridgeService
         return sanitized;
     }
 
+    public void Dispose()
+    {
+        if (_disposed)
+            return;
+
+        _disposed = true;
+        StopDaemon();
+    }
+
+    private sealed class DaemonConnection
+    {
+        public DaemonConnection(Process process) => Process = process;
+
+        public Process Process { get; }
+        public ConcurrentDictionary<long, DaemonRequest> Requests { get; } = new();
+        public SemaphoreSlim WriteLock { get; } = new(1, 1);
+        public volatile bool Closed;
+        public long LastOutputTicks;
+    }
+
+    private sealed class DaemonRequest
+    {
+        public DaemonRequest(Action<string> onLine) => OnLine = onLine;
+
+        public Action<string> OnLine { get; }
+        public TaskCompletionSource Completed { get; } = new(TaskCreationOptions.RunContinuationsAsynchronously);
+    }
+
     private class CommandResult
     {
      public string Output { get; set; } = string.Empty;
@@ -16,6 +16,7 @@ public class ThumbnailProcessingService : IThumbnailProcessingService
     private readonly IServiceProvider _serviceProvider;
     private readonly ILogger<ThumbnailProcessingService>? _logger;
     private readonly ConcurrentQueue<Model3D> _queue = new();
+    private readonly ConcurrentDictionary<int, bool> _regenerateIds = new(); // Models whose cached thumbnail must not be reused
     private CancellationTokenSource _cts = new();
     private readonly string _thumbnailsPath;
     private int _processingCount; // Track items currently being processed
@@ -61,7 +62,7 @@ public class ThumbnailProcessingService : IThumbnailProcessingService
         }
     }
 
-    public void QueueModel(Model3D model)
+    public void QueueModel(Model3D model, bool regenerate = false)
     {
         if (model.ThumbnailGenerated)
         {
@@ -76,6 +77,7 @@ public class ThumbnailProcessingService : IThumbnailProcessingService
             return;
         }
 
+        if (regenerate) _regenerateIds[model.Id] = true;
         _queue.Enqueue(model);
         _logger?.LogInformation("Model queued for thumbnail generation: {ModelName} (Queue size: {QueueSize})", model.Name, _queue.Count);
 
@@ -257,7 +259,8 @@ public class ThumbnailProcessingService : IThumbnailProcessingService
             {
                 ModelId = m.Id,
                 InputPath = m.FilePath,
-                OutputPath = Path.Combine(_thumbnailsPath, $"{m.Id}_{Guid.NewGuid():N}.png")
+                OutputPath = Path.Combine(_thumbnailsPath, $"{m.Id}_{Guid.NewGuid():N}.png"),
+                Force = _regenerateIds.TryRemove(m.Id, out _)
             }).ToList();
             
             // Maps for quick lookup in callback
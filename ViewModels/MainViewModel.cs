@@ -1364,7 +1364,7 @@ private string _totalFilamentUsed = "0g";
                 model.ThumbnailGenerated = false;
                 model.ThumbnailPath = null;
                 await _unitOfWork.Models.UpdateAsync(model);
-                _thumbnailService.QueueModel(model);
+                _thumbnailService.QueueModel(model, regenerate: true);
             }
 
             await _unitOfWork.SaveChangesAsync();